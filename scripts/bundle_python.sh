@@ -195,10 +195,13 @@ else
     exit 1
 fi
 
-# Copy venv bin and site-packages (with demucs and dependencies)
+# Copy venv bin and move site-packages (with demucs and dependencies)
+# The venv is deleted at the end anyway, so there is no point duplicating
+# several hundred MB of torch: mv is a rename on the same filesystem and
+# only falls back to copying across devices.
 echo "  Copying Python environment..."
 cp -R "$VENV_DIR/bin/"* "$BIN_DIR/" 2>/dev/null || true
-cp -R "$VENV_DIR/lib/python${PYTHON_VERSION_SHORT}/site-packages" "$LIB_DIR/python${PYTHON_VERSION_SHORT}/" 2>/dev/null || true
+mv "$VENV_DIR/lib/python${PYTHON_VERSION_SHORT}/site-packages" "$LIB_DIR/python${PYTHON_VERSION_SHORT}/" 2>/dev/null || true
 
 # Also copy any dylibs from the lib directory root
 if [ -d "$VENV_DIR/lib" ]; then
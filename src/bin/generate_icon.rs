@@ -1,11 +1,32 @@
 //! Generate app icon for Remix
 //!
-//! Creates PNG icons at various sizes and converts to .icns using iconutil.
+//! Renders PNG icons at the sizes macOS expects and writes them straight into
+//! an .icns container.
 //! Replaces the Python generate_app_icon.py script.
 
-use image::{imageops::FilterType, DynamicImage, Rgba, RgbaImage};
+use image::codecs::png::{CompressionType, FilterType as PngFilterType, PngEncoder};
+use image::{imageops::{self, FilterType}, ExtendedColorType, ImageEncoder, ImageResult, Rgba, RgbaImage};
+use std::collections::HashMap;
+use std::fs::File;
+use std::io::{BufWriter, Write};
 use std::path::Path;
-use std::process::Command;
+use std::sync::atomic::{AtomicUsize, Ordering};
+use std::sync::OnceLock;
+
+/// (OSType, pixel size) of each PNG stored in the .icns, matching what
+/// iconutil produces from a standard iconset
+const ICNS_ENTRIES: [(&[u8; 4], u32); 10] = [
+    (b"icp4", 16),   // 16x16
+    (b"ic11", 32),   // 16x16@2x
+    (b"icp5", 32),   // 32x32
+    (b"ic12", 64),   // 32x32@2x
+    (b"ic07", 128),  // 128x128
+    (b"ic13", 256),  // 128x128@2x
+    (b"ic08", 256),  // 256x256
+    (b"ic14", 512),  // 256x256@2x
+    (b"ic09", 512),  // 512x512
+    (b"ic10", 1024), // 512x512@2x
+];
 
 /// Color from hex string
 fn color(hex: &str) -> Rgba<u8> {
@@ -46,36 +67,38 @@ fn add_light(dst: Rgba<u8>, light: Rgba<u8>, strength: f32) -> Rgba<u8> {
     Rgba([clamp_u8(r), clamp_u8(g), clamp_u8(b), dst[3]])
 }
 
-/// Check if point is inside rounded rectangle
-fn in_rounded_rect(x: u32, y: u32, size: u32, radius: u32) -> bool {
+/// Coverage (0..1) of a pixel by the rounded rectangle.
+///
+/// Straight edges are pixel-aligned; along the corner arcs coverage ramps
+/// over one pixel so the outline is anti-aliased at the render resolution.
+/// Pixels inside the arc stay fully opaque so the arcs meet the straight
+/// edges without an alpha step at the tangent points.
+fn rounded_rect_coverage(x: u32, y: u32, size: u32, radius: u32) -> f32 {
     let x = x as i32;
     let y = y as i32;
     let size = size as i32;
     let radius = radius as i32;
     
-    // Check corners
-    if x < radius && y < radius {
-        let dx = radius - x;
-        let dy = radius - y;
-        return dx * dx + dy * dy <= radius * radius;
-    }
-    if x >= size - radius && y < radius {
-        let dx = x - (size - radius - 1);
-        let dy = radius - y;
-        return dx * dx + dy * dy <= radius * radius;
-    }
-    if x < radius && y >= size - radius {
-        let dx = radius - x;
-        let dy = y - (size - radius - 1);
-        return dx * dx + dy * dy <= radius * radius;
-    }
-    if x >= size - radius && y >= size - radius {
-        let dx = x - (size - radius - 1);
-        let dy = y - (size - radius - 1);
-        return dx * dx + dy * dy <= radius * radius;
-    }
+    // Offset from the center of the corner arc, if the pixel is in a corner
+    let corner = if x < radius && y < radius {
+        Some((radius - x, radius - y))
+    } else if x >= size - radius && y < radius {
+        Some((x - (size - radius - 1), radius - y))
+    } else if x < radius && y >= size - radius {
+        Some((radius - x, y - (size - radius - 1)))
+    } else if x >= size - radius && y >= size - radius {
+        Some((x - (size - radius - 1), y - (size - radius - 1)))
+    } else {
+        None
+    };
     
-    true
+    match corner {
+        Some((dx, dy)) => {
+            let d = ((dx * dx + dy * dy) as f32).sqrt();
+            (radius as f32 + 1.0 - d).clamp(0.0, 1.0)
+        }
+        None => 1.0,
+    }
 }
 
 fn smoothstep(edge0: f32, edge1: f32, x: f32) -> f32 {
@@ -109,6 +132,35 @@ fn approx_ribbon_cos_factor(t: f32, mid: f32, h: f32, phase: f32, offset: f32, w
     1.0 / (1.0 + dy_dx * dy_dx).sqrt()
 }
 
+/// Ribbon strand geometry for a single column.
+#[derive(Clone, Copy)]
+struct StrandColumn {
+    yc: f32,
+    cosf: f32,
+    core_sigma: f32,
+    mid_sigma: f32,
+    glow_sigma: f32,
+    hi_y: f32,
+    hi_sigma: f32,
+    intensity: f32,
+}
+
+/// Everything in the ribbon shading that depends only on x.
+///
+/// The ribbon curves are functions of the column parameter `t`, so evaluating
+/// them per pixel redoes the same trig/exp work `resolution` times per column.
+struct RibbonColumn {
+    vig_dx2: f32,
+    tip_fade: f32,
+    head_boost: f32,
+    warm: Rgba<u8>,
+    core: Rgba<u8>,
+    deep: Rgba<u8>,
+    body_y: f32,
+    body_cos: f32,
+    strands: [StrandColumn; 3],
+}
+
 /// Draw the Remix app icon at a given resolution.
 /// Render high-res once and downsample for crisp, anti-aliased edges.
 fn draw_icon(resolution: u32) -> RgbaImage {
@@ -134,43 +186,35 @@ fn draw_icon(resolution: u32) -> RgbaImage {
     let gold_hot = color("#FFD27A");
     let gold_warm = color("#FFB54A");
     let gold_deep = color("#FF8A1C");
+    let ember = color("#6B2B00");
 
-    for y in 0..resolution {
-        let ty = y as f32 / (resolution - 1).max(1) as f32;
-        let base_bg = lerp_color(bg_top, bg_bottom, ty);
+    // Vignette center
+    let cx = (resolution as f32 - 1.0) * 0.5;
+    let cy = (resolution as f32 - 1.0) * 0.5;
 
-        for x in 0..resolution {
-            if !in_rounded_rect(x, y, resolution, radius) {
-                img.put_pixel(x, y, Rgba([0, 0, 0, 0]));
-                continue;
-            }
+    // Map ribbon parameterization to a "safe" inner width, but allow t < 0 and t > 1
+    // so the glow can naturally extend towards the icon edges (no hard crop).
+    let w = ((x1 - x0).max(1)) as f32;
 
-            // Subtle vignette
-            let cx = (resolution as f32 - 1.0) * 0.5;
-            let cy = (resolution as f32 - 1.0) * 0.5;
-            let dx = (x as f32 - cx) / cx.max(1.0);
-            let dy = (y as f32 - cy) / cy.max(1.0);
-            let r2 = dx * dx + dy * dy;
-            let vig = (1.0 - 0.22 * smoothstep(0.15, 1.0, r2.sqrt())).clamp(0.0, 1.0);
-            let mut px = Rgba([
-                clamp_u8((base_bg[0] as f32) * vig),
-                clamp_u8((base_bg[1] as f32) * vig),
-                clamp_u8((base_bg[2] as f32) * vig),
-                255,
-            ]);
+    // Ribbon placement
+    let mid = y0 as f32 + content_h * 0.50;
+    let h = content_h;
 
-            let xi = x as i32;
-            let yi = y as i32;
-            // Map ribbon parameterization to a "safe" inner width, but allow t < 0 and t > 1
-            // so the glow can naturally extend towards the icon edges (no hard crop).
-            let w = ((x1 - x0).max(1)) as f32;
-            let t = (xi - x0) as f32 / w;
-            let tc = t.clamp(0.0, 1.0);
-            let yf = yi as f32;
+    // Multiple strands to suggest a light ribbon (kept tight like the reference)
+    let strands = [
+        (-0.055 * h, 0.55, 1.00),
+        (-0.015 * h, 1.05, 0.95),
+        (0.025 * h, 1.55, 0.90),
+    ];
+
+    // Global glow under the ribbon body (helps form the "sheet" on the left)
+    let body_sigma = (h * 0.11).max(10.0);
 
-            // Ribbon placement
-            let mid = y0 as f32 + content_h * 0.50;
-            let h = content_h;
+    let columns: Vec<RibbonColumn> = (0..resolution)
+        .map(|x| {
+            let dx = (x as f32 - cx) / cx.max(1.0);
+            let t = (x as i32 - x0) as f32 / w;
+            let tc = t.clamp(0.0, 1.0);
 
             // Fade out to a thin tip on the right; allow a bright bloom on the left.
             let tip_fade = smoothstep(0.0, 0.10, 1.0 - tc);
@@ -178,56 +222,88 @@ fn draw_icon(resolution: u32) -> RgbaImage {
 
             // Color gradient along the ribbon (warmer at the head, paler at the tip)
             let grad_t = smoothstep(0.0, 1.0, tc);
-            let warm = lerp_color(gold_deep, gold_hot, grad_t);
-            let core = lerp_color(gold_warm, gold_core, grad_t * 0.9);
-            let deep = lerp_color(color("#6B2B00"), gold_deep, grad_t);
-
-            // Multiple strands to suggest a light ribbon (kept tight like the reference)
-            let strands = [
-                (-0.055 * h, 0.55, 1.00),
-                (-0.015 * h, 1.05, 0.95),
-                (0.025 * h, 1.55, 0.90),
-            ];
-
-            // Global glow under the ribbon body (helps form the "sheet" on the left)
-            let body_y = golden_ribbon_y(t, mid, h, 0.85, 0.0);
-            let body_cos = approx_ribbon_cos_factor(t, mid, h, 0.85, 0.0, w);
-            let body_d = (yf - body_y).abs() * body_cos;
-            let body_sigma = (h * 0.11).max(10.0);
-            let body_i = gaussian(body_d, 0.0, body_sigma) * tip_fade * head_boost;
-            px = add_light(px, gold_warm, body_i * 0.20);
 
-            for (off, phase, weight) in strands {
+            let strands = strands.map(|(off, phase, weight)| {
                 let yc = golden_ribbon_y(t, mid, h, phase, off);
                 let cosf = approx_ribbon_cos_factor(t, mid, h, phase, off, w);
-                let d = (yf - yc).abs() * cosf;
 
                 // Taper thickness strongly towards the right tip
                 let thick = lerp(h * 0.060, h * 0.014, smoothstep(0.10, 1.0, tc)) * weight;
 
-                // Glow layers
-                let core_sigma = (thick * 0.18).max(1.2);
-                let mid_sigma = (thick * 0.55).max(2.8);
-                let glow_sigma = (thick * 1.25).max(6.0);
+                StrandColumn {
+                    yc,
+                    cosf,
+                    // Glow layers
+                    core_sigma: (thick * 0.18).max(1.2),
+                    mid_sigma: (thick * 0.55).max(2.8),
+                    glow_sigma: (thick * 1.25).max(6.0),
+                    // A thin highlight slightly above the strand to mimic specular
+                    hi_y: yc - thick * 0.16,
+                    hi_sigma: (thick * 0.14).max(1.0),
+                    intensity: tip_fade * head_boost * weight,
+                }
+            });
+
+            RibbonColumn {
+                vig_dx2: dx * dx,
+                tip_fade,
+                head_boost,
+                warm: lerp_color(gold_deep, gold_hot, grad_t),
+                core: lerp_color(gold_warm, gold_core, grad_t * 0.9),
+                deep: lerp_color(ember, gold_deep, grad_t),
+                body_y: golden_ribbon_y(t, mid, h, 0.85, 0.0),
+                body_cos: approx_ribbon_cos_factor(t, mid, h, 0.85, 0.0, w),
+                strands,
+            }
+        })
+        .collect();
+
+    for y in 0..resolution {
+        let ty = y as f32 / (resolution - 1).max(1) as f32;
+        let base_bg = lerp_color(bg_top, bg_bottom, ty);
+        let dy = (y as f32 - cy) / cy.max(1.0);
+        let vig_dy2 = dy * dy;
+        let yf = y as f32;
+
+        for (x, col) in (0..resolution).zip(&columns) {
+            let coverage = rounded_rect_coverage(x, y, resolution, radius);
+            if coverage <= 0.0 {
+                img.put_pixel(x, y, Rgba([0, 0, 0, 0]));
+                continue;
+            }
 
-                let i_core = gaussian(d, 0.0, core_sigma);
-                let i_mid = gaussian(d, 0.0, mid_sigma);
-                let i_glow = gaussian(d, 0.0, glow_sigma);
+            // Subtle vignette
+            let r2 = col.vig_dx2 + vig_dy2;
+            let vig = (1.0 - 0.22 * smoothstep(0.15, 1.0, r2.sqrt())).clamp(0.0, 1.0);
+            let mut px = Rgba([
+                clamp_u8((base_bg[0] as f32) * vig),
+                clamp_u8((base_bg[1] as f32) * vig),
+                clamp_u8((base_bg[2] as f32) * vig),
+                255,
+            ]);
+
+            let body_d = (yf - col.body_y).abs() * col.body_cos;
+            let body_i = gaussian(body_d, 0.0, body_sigma) * col.tip_fade * col.head_boost;
+            px = add_light(px, gold_warm, body_i * 0.20);
 
-                let intensity = tip_fade * head_boost * weight;
+            for s in &col.strands {
+                let d = (yf - s.yc).abs() * s.cosf;
+
+                let i_core = gaussian(d, 0.0, s.core_sigma);
+                let i_mid = gaussian(d, 0.0, s.mid_sigma);
+                let i_glow = gaussian(d, 0.0, s.glow_sigma);
 
                 // Outer bloom (deep/warm), then hot glow, then bright core.
-                px = add_light(px, deep, i_glow * 0.16 * intensity);
-                px = add_light(px, warm, i_mid * 0.36 * intensity);
-                px = add_light(px, core, i_core * 0.55 * intensity);
-
-                // A thin highlight slightly above the strand to mimic specular
-                let hi_y = yc - thick * 0.16;
-                let dhi = (yf - hi_y).abs() * cosf;
-                let i_hi = gaussian(dhi, 0.0, (thick * 0.14).max(1.0));
-                px = add_light(px, gold_core, i_hi * 0.32 * intensity);
+                px = add_light(px, col.deep, i_glow * 0.16 * s.intensity);
+                px = add_light(px, col.warm, i_mid * 0.36 * s.intensity);
+                px = add_light(px, col.core, i_core * 0.55 * s.intensity);
+
+                let dhi = (yf - s.hi_y).abs() * s.cosf;
+                let i_hi = gaussian(dhi, 0.0, s.hi_sigma);
+                px = add_light(px, gold_core, i_hi * 0.32 * s.intensity);
             }
 
+            px.0[3] = clamp_u8(255.0 * coverage);
             img.put_pixel(x, y, px);
         }
     }
@@ -235,41 +311,105 @@ fn draw_icon(resolution: u32) -> RgbaImage {
     img
 }
 
-fn render_icon(size: u32) -> RgbaImage {
+/// Resolution an icon of `size` is drawn at before downsampling.
+fn render_size(size: u32) -> u32 {
     // Render high-res once and downsample for clean edges at small sizes.
-    let render_size = (size * 4).max(1024).min(4096);
-    let hi = draw_icon(render_size);
-    if render_size == size {
-        return hi;
+    // The outline is anti-aliased while drawing, so 2x is enough headroom
+    // for the larger sizes.
+    (size * 2).max(1024).min(4096)
+}
+
+fn render_icon(size: u32, master: &RgbaImage) -> RgbaImage {
+    if master.width() == size {
+        return master.clone();
     }
-    let dyn_img = DynamicImage::ImageRgba8(hi);
-    dyn_img
-        .resize_exact(size, size, FilterType::Lanczos3)
-        .to_rgba8()
+    imageops::resize(master, size, size, FilterType::Lanczos3)
 }
 
-/// Generate all icon sizes for macOS iconset
-fn generate_iconset(output_dir: &Path) -> std::io::Result<()> {
-    std::fs::create_dir_all(output_dir)?;
+/// Encode an RGBA image as PNG straight from its contiguous pixel buffer.
+///
+/// Uses a single Paeth filter for every scanline instead of the encoder's
+/// adaptive heuristic, which trial-filters each row five ways before picking one.
+/// Debug builds trade file size for speed with the fast deflate mode; release
+/// builds (what the app bundle ships) keep the default level.
+fn encode_png(img: &RgbaImage) -> ImageResult<Vec<u8>> {
+    let compression = if cfg!(debug_assertions) {
+        CompressionType::Fast
+    } else {
+        CompressionType::Default
+    };
+    let mut png = Vec::new();
+    let encoder = PngEncoder::new_with_quality(&mut png, compression, PngFilterType::Paeth);
+    encoder.write_image(img.as_raw(), img.width(), img.height(), ExtendedColorType::Rgba8)?;
+    Ok(png)
+}
+
+/// Render and PNG-encode each distinct icon size, keyed by pixel size
+fn render_pngs(sizes: &[u32]) -> HashMap<u32, Vec<u8>> {
+    // Each size is rendered and encoded independently, so spread them over a
+    // pool of worker threads. Largest first: they dominate the wall clock.
+    let mut sizes = sizes.to_vec();
+    sizes.sort_unstable_by(|a, b| b.cmp(a));
+    sizes.dedup();
+    let workers = std::thread::available_parallelism()
+        .map(|n| n.get())
+        .unwrap_or(1)
+        .min(sizes.len());
+    let next = AtomicUsize::new(0);
     
-    let sizes = [16u32, 32, 64, 128, 256, 512, 1024];
+    // Most sizes share a master (everything up to 512px is drawn at 1024),
+    // so draw each master once and downsample every icon from it.
+    let masters: HashMap<u32, OnceLock<RgbaImage>> = sizes
+        .iter()
+        .map(|&size| (render_size(size), OnceLock::new()))
+        .collect();
     
-    for &size in &sizes {
-        let img = render_icon(size);
-        let path = output_dir.join(format!("icon_{}x{}.png", size, size));
-        img.save(&path).expect("Failed to save icon");
-        println!("Generated: {}", path.display());
+    let (sizes, next, masters) = (&sizes, &next, &masters);
+    std::thread::scope(|scope| {
+        let handles: Vec<_> = (0..workers)
+            .map(|_| {
+                scope.spawn(move || {
+                    let mut pngs = Vec::new();
+                    while let Some(&size) = sizes.get(next.fetch_add(1, Ordering::Relaxed)) {
+                        let resolution = render_size(size);
+                        let master = masters[&resolution].get_or_init(|| draw_icon(resolution));
+                        let png = encode_png(&render_icon(size, master)).expect("Failed to encode icon");
+                        println!("Generated: {}x{}", size, size);
+                        pngs.push((size, png));
+                    }
+                    pngs
+                })
+            })
+            .collect();
         
-        // @2x versions (except for 1024)
-        if size <= 512 {
-            let img_2x = render_icon(size * 2);
-            let path_2x = output_dir.join(format!("icon_{}x{}@2x.png", size, size));
-            img_2x.save(&path_2x).expect("Failed to save @2x icon");
-            println!("Generated: {}", path_2x.display());
-        }
-    }
+        handles
+            .into_iter()
+            .flat_map(|handle| handle.join().expect("Icon worker panicked"))
+            .collect()
+    })
+}
+
+/// Write the rendered PNGs into an .icns file.
+///
+/// The container is a big-endian `icns` header (magic + total length)
+/// followed by one (OSType, length, data) record per image; PNG payloads are
+/// stored as-is, so nothing is decoded or re-encoded.
+fn write_icns(path: &Path, pngs: &HashMap<u32, Vec<u8>>) -> std::io::Result<()> {
+    let total_len: usize = 8 + ICNS_ENTRIES
+        .iter()
+        .map(|(_, size)| 8 + pngs[size].len())
+        .sum::<usize>();
     
-    Ok(())
+    let mut out = BufWriter::new(File::create(path)?);
+    out.write_all(b"icns")?;
+    out.write_all(&(total_len as u32).to_be_bytes())?;
+    for (ostype, size) in ICNS_ENTRIES {
+        let png = &pngs[&size];
+        out.write_all(ostype)?;
+        out.write_all(&((8 + png.len()) as u32).to_be_bytes())?;
+        out.write_all(png)?;
+    }
+    out.flush()
 }
 
 fn main() {
@@ -281,35 +421,58 @@ fn main() {
         .and_then(|p| p.parent()) // project root
         .expect("Failed to find project root");
     
-    let iconset_dir = project_root.join("scripts").join("Remix.iconset");
     let icns_path = project_root.join("scripts").join("Remix.icns");
     
-    // Clear existing iconset
-    if iconset_dir.exists() {
-        for entry in std::fs::read_dir(&iconset_dir).unwrap() {
-            let entry = entry.unwrap();
-            std::fs::remove_file(entry.path()).ok();
-        }
-    }
-    
-    // Generate iconset
-    println!("Generating iconset at: {}", iconset_dir.display());
-    generate_iconset(&iconset_dir).expect("Failed to generate iconset");
+    println!("Rendering icon sizes...");
+    let sizes: Vec<u32> = ICNS_ENTRIES.iter().map(|&(_, size)| size).collect();
+    let pngs = render_pngs(&sizes);
     
-    // Convert to .icns using iconutil (macOS only)
-    println!("Converting to .icns...");
-    let status = Command::new("iconutil")
-        .args(["-c", "icns"])
-        .arg(&iconset_dir)
-        .arg("-o")
-        .arg(&icns_path)
-        .status()
-        .expect("Failed to run iconutil");
-    
-    if status.success() {
-        println!("Created: {}", icns_path.display());
-    } else {
-        eprintln!("iconutil failed with status: {}", status);
+    // Write the .icns directly rather than via an .iconset directory and
+    // iconutil, which would re-read and re-encode every PNG
+    println!("Writing .icns...");
+    if let Err(e) = write_icns(&icns_path, &pngs) {
+        eprintln!("Failed to write {}: {}", icns_path.display(), e);
         std::process::exit(1);
     }
+    println!("Created: {}", icns_path.display());
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    
+    #[test]
+    fn test_outline_alpha_continuous_at_arc_tangents() {
+        // The last arc pixel before each of the eight tangent points should be
+        // nearly as opaque as the straight-edge pixel next to it.
+        let size = 64u32;
+        let img = draw_icon(size);
+        let r = (size as f32 * 0.21) as u32;
+        let last = size - 1;
+        let alpha = |(x, y): (u32, u32)| img.get_pixel(x, y)[3] as i32;
+        
+        // (arc pixel, straight-edge neighbour)
+        let tangents = [
+            ((r - 1, 0), (r, 0)),
+            ((size - r, 0), (size - r - 1, 0)),
+            ((r - 1, last), (r, last)),
+            ((size - r, last), (size - r - 1, last)),
+            ((0, r - 1), (0, r)),
+            ((0, size - r), (0, size - r - 1)),
+            ((last, r - 1), (last, r)),
+            ((last, size - r), (last, size - r - 1)),
+        ];
+        
+        for (arc, edge) in tangents {
+            assert_eq!(alpha(edge), 255, "straight edge at {:?} not opaque", edge);
+            let step = alpha(edge) - alpha(arc);
+            assert!(
+                (0..=16).contains(&step),
+                "alpha step {} between arc {:?} and edge {:?}",
+                step,
+                arc,
+                edge
+            );
+        }
+    }
 }
@@ -72,9 +72,17 @@ fn find_python() -> Result<String> {
 }
 
 /// Check if demucs is installed
+///
+/// Looks the package up with `importlib.util.find_spec` rather than importing
+/// it, so no demucs code runs during the check.
 fn check_demucs_installed(python: &str) -> Result<()> {
     let output = Command::new(python)
-        .args(["-c", "import demucs; print(demucs.__version__)"])
+        .args([
+            "-c",
+            "import importlib.util, sys\n\
+             if importlib.util.find_spec('demucs') is None:\n    \
+             sys.exit(\"No module named 'demucs'\")",
+        ])
         .output()
         .context("Failed to run Python")?;
     
@@ -150,10 +158,14 @@ pub fn separate_file(
     // Run demucs via Python
     // Command: python -m demucs --two-stems=vocals -n htdemucs_6s -o output_dir input_file
     // For 6-stem: python -m demucs -n htdemucs_6s -o output_dir input_file
+    // --shifts 0 (the CLI default is 1) still runs one pass per segment, but
+    // skips padding a full-track copy by 2 * max_shift and the random
+    // 0-0.5s offset, so output is deterministic for a given input.
     let output = Command::new(&model.python_path)
         .args([
             "-m", "demucs",
             "-n", &model.model_name,
+            "--shifts", "0",
             "-o", output_dir.to_str().unwrap_or("."),
             input_path.to_str().unwrap_or(""),
         ])
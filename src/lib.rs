@@ -126,6 +126,7 @@ pub fn load_audio_symphonia(data: &[u8]) -> Result<DecodedAudio> {
     
     let track_id = track.id;
     let mut samples: Vec<f64> = Vec::new();
+    let mut sample_buf: Option<SampleBuffer<f32>> = None;
     
     loop {
         let packet = match format.next_packet() {
@@ -145,33 +146,36 @@ pub fn load_audio_symphonia(data: &[u8]) -> Result<DecodedAudio> {
             Err(e) => return Err(e.into()),
         };
         
+        // Reuse one interleaved buffer across packets, only reallocating
+        // if a packet is larger than the buffer
         let spec = *decoded.spec();
         let duration = decoded.capacity() as u64;
-        
-        let mut sample_buf = SampleBuffer::<f32>::new(duration, spec);
+        let needed = decoded.capacity() * spec.channels.count();
+        if sample_buf.as_ref().map_or(true, |b| b.capacity() < needed) {
+            sample_buf = Some(SampleBuffer::<f32>::new(duration, spec));
+        }
+        let sample_buf = sample_buf.as_mut().unwrap();
         sample_buf.copy_interleaved_ref(decoded);
+        let interleaved = sample_buf.samples();
         
-        for &s in sample_buf.samples() {
-            samples.push(s as f64);
+        // Convert to mono while decoding rather than collecting the full
+        // interleaved track and mixing it down in a second pass
+        match channels {
+            0 | 1 => samples.extend(interleaved.iter().map(|&s| s as f64)),
+            2 => samples.extend(
+                interleaved.chunks(2)
+                    .map(|chunk| (chunk[0] as f64 + chunk.get(1).map_or(0.0, |&s| s as f64)) / 2.0),
+            ),
+            // Mix down all channels
+            _ => samples.extend(
+                interleaved.chunks(channels as usize)
+                    .map(|chunk| chunk.iter().map(|&s| s as f64).sum::<f64>() / channels as f64),
+            ),
         }
     }
     
-    // Convert to mono if stereo
-    let mono_samples = if channels == 2 {
-        samples.chunks(2)
-            .map(|chunk| (chunk[0] + chunk.get(1).unwrap_or(&0.0)) / 2.0)
-            .collect()
-    } else if channels > 2 {
-        // Mix down all channels
-        samples.chunks(channels as usize)
-            .map(|chunk| chunk.iter().sum::<f64>() / channels as f64)
-            .collect()
-    } else {
-        samples
-    };
-    
     Ok(DecodedAudio {
-        samples: mono_samples,
+        samples,
         sample_rate,
         channels,
     })
@@ -206,6 +210,9 @@ pub fn load_audio_from_bytes(data: &[u8]) -> Result<(Vec<f64>, u32)> {
     }
 }
 
+/// Upper bound on the size of the RIFF/fmt/data headers hound writes
+const WAV_HEADER_RESERVE: usize = 128;
+
 /// Encode audio samples as WAV bytes
 pub fn encode_wav_to_bytes(samples: &[f64], sample_rate: u32) -> Result<Vec<u8>> {
     let spec = WavSpec {
@@ -215,7 +222,10 @@ pub fn encode_wav_to_bytes(samples: &[f64], sample_rate: u32) -> Result<Vec<u8>>
         sample_format: SampleFormat::Float,
     };
     
-    let mut buffer = Cursor::new(Vec::new());
+    // Size the buffer for the whole file up front; growing it sample by sample
+    // reallocates and copies a track-sized buffer several times over.
+    let data_len = samples.len() * (spec.bits_per_sample / 8) as usize;
+    let mut buffer = Cursor::new(Vec::with_capacity(WAV_HEADER_RESERVE + data_len));
     {
         let mut writer = hound::WavWriter::new(&mut buffer, spec)?;
         for &sample in samples {
@@ -226,3 +236,59 @@ pub fn encode_wav_to_bytes(samples: &[f64], sample_rate: u32) -> Result<Vec<u8>>
     
     Ok(buffer.into_inner())
 }
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    
+    /// Encode interleaved float samples as a 32-bit float WAV
+    fn float_wav(channels: u16, interleaved: &[f32]) -> Vec<u8> {
+        let spec = WavSpec {
+            channels,
+            sample_rate: 44100,
+            bits_per_sample: 32,
+            sample_format: SampleFormat::Float,
+        };
+        let mut buffer = Cursor::new(Vec::new());
+        {
+            let mut writer = hound::WavWriter::new(&mut buffer, spec).unwrap();
+            for &sample in interleaved {
+                writer.write_sample(sample).unwrap();
+            }
+            writer.finalize().unwrap();
+        }
+        buffer.into_inner()
+    }
+    
+    // Long enough to span many decoder packets
+    const FRAMES: usize = 20_000;
+    
+    #[test]
+    fn test_symphonia_stereo_downmix() {
+        let left: Vec<f32> = (0..FRAMES).map(|i| (i as f32 * 0.01).sin() * 0.5).collect();
+        let right: Vec<f32> = (0..FRAMES).map(|i| (i as f32 * 0.013).cos() * 0.25).collect();
+        let interleaved: Vec<f32> = left.iter().zip(&right).flat_map(|(&l, &r)| [l, r]).collect();
+        
+        let decoded = load_audio_symphonia(&float_wav(2, &interleaved)).unwrap();
+        
+        let expected: Vec<f64> = left.iter().zip(&right)
+            .map(|(&l, &r)| (l as f64 + r as f64) / 2.0)
+            .collect();
+        assert_eq!(decoded.channels, 2);
+        assert_eq!(decoded.sample_rate, 44100);
+        assert_eq!(decoded.samples.len(), FRAMES);
+        assert_eq!(decoded.samples, expected);
+    }
+    
+    #[test]
+    fn test_symphonia_mono_passthrough() {
+        let mono: Vec<f32> = (0..FRAMES).map(|i| (i as f32 * 0.02).sin() * 0.75).collect();
+        
+        let decoded = load_audio_symphonia(&float_wav(1, &mono)).unwrap();
+        
+        let expected: Vec<f64> = mono.iter().map(|&s| s as f64).collect();
+        assert_eq!(decoded.channels, 1);
+        assert_eq!(decoded.samples.len(), FRAMES);
+        assert_eq!(decoded.samples, expected);
+    }
+}